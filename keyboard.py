@@ -1,32 +1,14 @@
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import logging
+import os
 import numpy as np
+
+os.environ.setdefault('SDL_VIDEO_CENTERED', '1')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
 import pygame
-import struct
-import serial
 import time
-import pyudev
-
-
-def find_stm32_port() -> str:
-    """
-    Find the STM32 serial port.
-    
-    Returns:
-        str: The STM32 serial device path
-        
-    Raises:
-        RuntimeError: If the STM32 device is not found
-    """
-    context = pyudev.Context()
-    for device in context.list_devices(subsystem='tty'):
-        if 'ID_VENDOR_ID' in device and 'ID_MODEL_ID' in device:
-            vendor_id: str = device.get('ID_VENDOR_ID')
-            model_id: str = device.get('ID_MODEL_ID')
 
-            if vendor_id == '0483' and model_id == '5740':
-                return device.device_node  
-
-    raise RuntimeError("STM32 Virtual COM Port not found!")
+from serial_link import SerialLink
 
 
 class KeyboardControl:
@@ -34,6 +16,8 @@ class KeyboardControl:
         """Initialize the keyboard control."""
         self.robot_id: int = 0  
         self.MAX_SPEED: float = 1.0  
+        self.TICK_HZ: int = 100
+        self._clock: pygame.time.Clock = pygame.time.Clock()
         
         # Movement control variables
         self.vl: float = 0.0
@@ -42,23 +26,41 @@ class KeyboardControl:
         self.backward: bool = False
         self.left: bool = False
         self.right: bool = False
+        # (vl, vr) for every key combination, indexed by the packed key bits
+        self._lut: np.ndarray = np.empty((16, 2), dtype=np.float32)
+        for bits in range(16):
+            fwd: int = (bits & 1) - ((bits >> 1) & 1)
+            turn: int = ((bits >> 3) & 1) - ((bits >> 2) & 1)
+            self._lut[bits] = (
+                fwd * self.MAX_SPEED + turn * self.MAX_SPEED / 2,
+                fwd * self.MAX_SPEED - turn * self.MAX_SPEED / 2,
+            )
         
         # Screen setup for keyboard events capture
         self.screen: Optional[pygame.Surface] = None
-        self.instruction_surfaces: List[pygame.Surface] = []
         self.instructions: List[str] = []
+        self._font_big: Optional[pygame.font.Font] = None
+        self._bg: Optional[pygame.Surface] = None
+        # Screen regions of the status lines and the text last drawn in each
+        self._line_rects: List[pygame.Rect] = []
+        self._line_text: List[Optional[str]] = []
+        self._full_redraw: bool = True
+        # Rendered text surfaces keyed by (text, color), and the state last drawn
+        self._cache: Dict[Tuple[str, Tuple[int, int, int]], pygame.Surface] = {}
+        self._last_state: Optional[Tuple[Union[int, float, bool], ...]] = None
         
         # Connect to serial device
         try:
-            self.ser: serial.Serial = serial.Serial(find_stm32_port(), 115200, timeout=1)
-            print(f"✅ Connected to STM32 on port {self.ser.port}")
+            self.link: SerialLink = SerialLink()
+            print(f"✅ Connected to STM32 on port {self.link.port}")
         except Exception as e:
             print(f"❌ Error connecting to STM32: {e}")
             raise
 
     def setup(self) -> None:
-        """Initialize Pygame and set up the window."""
-        pygame.init()
+        """Initialize the required Pygame subsystems and set up the window."""
+        pygame.display.init()
+        pygame.font.init()
         # Create a small window to capture keyboard events
         self.screen = pygame.display.set_mode((400, 250))
         pygame.display.set_caption('Keyboard Control')
@@ -72,7 +74,20 @@ class KeyboardControl:
             "Press X to change robot ID",
             "ESC to exit"
         ]
-        self.instruction_surfaces = [font.render(instr, True, (255, 255, 255)) for instr in self.instructions]
+        self._font_big = pygame.font.Font(None, 36)
+        
+        # Pre-draw the static instruction block onto a single background surface
+        # in the display's pixel format, so each frame needs only one blit
+        self._bg = pygame.Surface(self.screen.get_size()).convert()
+        self._bg.fill((0, 0, 0))
+        y_pos: int = 20
+        for instr in self.instructions:
+            self._bg.blit(font.render(instr, True, (255, 255, 255)), (20, y_pos))
+            y_pos += 30
+        # Robot ID, velocities and active keys, one 40px row each
+        width: int = self.screen.get_width()
+        self._line_rects = [pygame.Rect(0, y_pos + 10 + 40 * i, width, 40) for i in range(3)]
+        self._line_text = [None] * len(self._line_rects)
         
         print("⌨️ Keyboard control initialized.")
         print("Use arrow keys or WASD to move, X to change robot ID, ESC to exit.")
@@ -80,29 +95,60 @@ class KeyboardControl:
     def send_data(self) -> None:
         """Send data via serial to the STM32."""
         try:
-            data: bytes = struct.pack('iff', self.robot_id, self.vl, self.vr)
-            self.ser.write(data)
-            print(f"📤 Sent: ID={self.robot_id}, VL={self.vl:.2f}, VR={self.vr:.2f}")
+            self.link.send(self.robot_id, self.vl, self.vr)
         except Exception as e:
             print(f"❌ Error sending data: {e}")
 
+    def flush_data(self) -> None:
+        """Flush buffered packets to the STM32."""
+        try:
+            self.link.flush()
+        except Exception as e:
+            print(f"❌ Error flushing data: {e}")
+
+    def render_text(self, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """
+        Render a status line, reusing a cached surface when available.
+        
+        Args:
+            text: The text to render
+            color: The RGB text color
+            
+        Returns:
+            pygame.Surface: The rendered text surface
+        """
+        key: Tuple[str, Tuple[int, int, int]] = (text, color)
+        surface: Optional[pygame.Surface] = self._cache.get(key)
+        if surface is None:
+            surface = self._font_big.render(text, True, color, (0, 0, 0)).convert()
+            self._cache[key] = surface
+        return surface
+
+    def draw_line(self, index: int, text: str, color: Tuple[int, int, int]) -> Optional[pygame.Rect]:
+        """
+        Redraw a status line if its text changed.
+        
+        Args:
+            index: The status line index
+            text: The text to show, or an empty string to clear the line
+            color: The RGB text color
+            
+        Returns:
+            Optional[pygame.Rect]: The updated screen region, or None if unchanged
+        """
+        if text == self._line_text[index]:
+            return None
+        self._line_text[index] = text
+        rect: pygame.Rect = self._line_rects[index]
+        self.screen.blit(self._bg, rect, rect)
+        if text:
+            self.screen.blit(self.render_text(text, color), (rect.x + 20, rect.y))
+        return rect
+
     def update_velocities(self) -> None:
         """Update velocities based on pressed keys."""
-        self.vl = 0.0
-        self.vr = 0.0
-        
-        if self.forward:
-            self.vl += self.MAX_SPEED
-            self.vr += self.MAX_SPEED
-        if self.backward:
-            self.vl -= self.MAX_SPEED
-            self.vr -= self.MAX_SPEED
-        if self.left:
-            self.vl -= self.MAX_SPEED/2
-            self.vr += self.MAX_SPEED/2
-        if self.right:
-            self.vl += self.MAX_SPEED/2
-            self.vr -= self.MAX_SPEED/2
+        bits: int = self.forward | (self.backward << 1) | (self.left << 2) | (self.right << 3)
+        self.vl, self.vr = self._lut[bits].tolist()
 
     def process_input(self) -> bool:
         """
@@ -115,71 +161,48 @@ class KeyboardControl:
             if event.type == pygame.QUIT:
                 return False
                 
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    return False
-                # Arrow keys
-                elif event.key == pygame.K_UP:
-                    self.forward = True
-                elif event.key == pygame.K_DOWN:
-                    self.backward = True
-                elif event.key == pygame.K_LEFT:
-                    self.left = True
-                elif event.key == pygame.K_RIGHT:
-                    self.right = True
-                # WASD keys
-                elif event.key == pygame.K_w:
-                    self.forward = True
-                elif event.key == pygame.K_s:
-                    self.backward = True
-                elif event.key == pygame.K_a:
-                    self.left = True
-                elif event.key == pygame.K_d:
-                    self.right = True
-                # Change robot ID
-                elif event.key == pygame.K_x:
-                    self.robot_id = (self.robot_id + 1) % 4
-                    print(f"🚀 Robot ID changed to: {self.robot_id}")
-                    
-            elif event.type == pygame.KEYUP:
-                # Arrow keys
-                if event.key == pygame.K_UP:
-                    self.forward = False
-                elif event.key == pygame.K_DOWN:
-                    self.backward = False
-                elif event.key == pygame.K_LEFT:
-                    self.left = False
-                elif event.key == pygame.K_RIGHT:
-                    self.right = False
-                # WASD keys
-                elif event.key == pygame.K_w:
-                    self.forward = False
-                elif event.key == pygame.K_s:
-                    self.backward = False
-                elif event.key == pygame.K_a:
-                    self.left = False
-                elif event.key == pygame.K_d:
-                    self.right = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                return False
+                
+            # Change robot ID
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_x:
+                self.robot_id = (self.robot_id + 1) % 4
+                print(f"🚀 Robot ID changed to: {self.robot_id}")
+                
+            # Window was uncovered: force a redraw
+            elif event.type == pygame.VIDEOEXPOSE:
+                self._last_state = None
+                self._full_redraw = True
+        
+        # Poll held movement keys (arrow keys and WASD)
+        keys: Sequence[bool] = pygame.key.get_pressed()
+        self.forward = bool(keys[pygame.K_w] or keys[pygame.K_UP])
+        self.backward = bool(keys[pygame.K_s] or keys[pygame.K_DOWN])
+        self.left = bool(keys[pygame.K_a] or keys[pygame.K_LEFT])
+        self.right = bool(keys[pygame.K_d] or keys[pygame.K_RIGHT])
         
         self.update_velocities()
         self.send_data()
         
-        # Update screen with instructions
-        if self.screen:
-            self.screen.fill((0, 0, 0))
-            y_pos: int = 20
-            for surface in self.instruction_surfaces:
-                self.screen.blit(surface, (20, y_pos))
-                y_pos += 30
+        # Update screen only when the displayed state changed
+        state: Tuple[Union[int, float, bool], ...] = (
+            self.robot_id, round(self.vl, 2), round(self.vr, 2),
+            self.forward, self.backward, self.left, self.right
+        )
+        if self.screen and state != self._last_state:
+            self._last_state = state
+            dirty: List[Optional[pygame.Rect]] = []
+            if self._full_redraw:
+                self._full_redraw = False
+                self.screen.blit(self._bg, (0, 0))
+                self._line_text = [None] * len(self._line_rects)
+                dirty.append(self.screen.get_rect())
                 
             # Show current robot ID
-            font: pygame.font.Font = pygame.font.Font(None, 36)
-            id_text: pygame.Surface = font.render(f"Robot ID: {self.robot_id}", True, (255, 255, 0))
-            self.screen.blit(id_text, (20, y_pos + 10))
+            dirty.append(self.draw_line(0, f"Robot ID: {self.robot_id}", (255, 255, 0)))
             
             # Show current velocities
-            vel_text: pygame.Surface = font.render(f"VL: {self.vl:.2f}, VR: {self.vr:.2f}", True, (0, 255, 255))
-            self.screen.blit(vel_text, (20, y_pos + 50))
+            dirty.append(self.draw_line(1, f"VL: {self.vl:.2f}, VR: {self.vr:.2f}", (0, 255, 255)))
             
             # Show active keys
             active_keys: List[str] = []
@@ -188,12 +211,15 @@ class KeyboardControl:
             if self.left: active_keys.append("A/Left")
             if self.right: active_keys.append("D/Right")
             
-            if active_keys:
-                key_text: pygame.Surface = font.render(f"Active keys: {', '.join(active_keys)}", True, (255, 128, 0))
-                self.screen.blit(key_text, (20, y_pos + 90))
+            key_line: str = f"Active keys: {', '.join(active_keys)}" if active_keys else ""
+            dirty.append(self.draw_line(2, key_line, (255, 128, 0)))
             
-            pygame.display.flip()
+            # Push only the regions that changed to the display
+            changed: List[pygame.Rect] = [rect for rect in dirty if rect is not None]
+            if changed:
+                pygame.display.update(changed)
         
+        self.flush_data()
         return True
 
     def run(self) -> None:
@@ -202,15 +228,25 @@ class KeyboardControl:
             running: bool = True
             while running:
                 running = self.process_input()
+                if not (self.forward or self.backward or self.left or self.right):
+                    # Idle: block until the next event instead of polling
+                    event: pygame.event.Event = pygame.event.wait(timeout=1000 // self.TICK_HZ)
+                    if event.type != pygame.NOEVENT:
+                        pygame.event.post(event)
+                self._clock.tick(self.TICK_HZ)
         except KeyboardInterrupt:
             print("\nShutting down...")
         finally:
             pygame.quit()
-            if hasattr(self, 'ser') and self.ser.is_open:
-                self.ser.close()
+            if hasattr(self, 'link'):
+                try:
+                    self.link.close()
+                except Exception as e:
+                    print(f"❌ Error flushing data: {e}")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
     controller: KeyboardControl = KeyboardControl()
     controller.setup()
     controller.run()
\ No newline at end of file
@@ -1,23 +1,12 @@
+import logging
+import os
 import numpy as np
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
 import pygame
-import struct
-import serial
 import time
-import pyudev
-
-
-def find_stm32_port():
-    context = pyudev.Context()
-    for device in context.list_devices(subsystem='tty'):
-        if 'ID_VENDOR_ID' in device and 'ID_MODEL_ID' in device:
-            vendor_id = device.get('ID_VENDOR_ID')
-            model_id = device.get('ID_MODEL_ID')
-
-
-            if vendor_id == '0483' and model_id == '5740':
-                return device.device_node  
 
-    raise RuntimeError("STM32 Virtual COM Port não encontrado!")
+from serial_link import SerialLink
 
 
 class JoystickControl:
@@ -32,13 +21,17 @@ class JoystickControl:
         self.AXIS_LEFT_STICK_Y = 1  
         self.BUTTON_X = 0  
         self.MAX_SPEED = 1.0  
-        self.ser = serial.Serial(find_stm32_port(), 115200, timeout=1)
+        self.TICK_HZ = 100
+        self._clock = pygame.time.Clock()
 
-        print(f"✅ Conectado ao STM32 na porta {self.ser.port}")
+        self.link = SerialLink()
+
+        print(f"✅ Conectado ao STM32 na porta {self.link.port}")
 
     def setup(self):
-        """Inicializa o Pygame e configura o joystick."""
-        pygame.init()
+        """Inicializa os subsistemas necessários do Pygame e configura o joystick."""
+        # O subsistema de vídeo é necessário para a fila de eventos
+        pygame.display.init()
         pygame.joystick.init()
 
         if pygame.joystick.get_count() < 1:
@@ -51,12 +44,17 @@ class JoystickControl:
     def send_data(self, vl, vr):
         """Envia os dados via serial para o STM32."""
         try:
-            data = struct.pack('iff', self.robot_id, vl, vr)
-            self.ser.write(data)
-            print(f"📤 Enviado: ID={self.robot_id}, VL={vl:.2f}, VR={vr:.2f}")
+            self.link.send(self.robot_id, vl, vr)
         except Exception as e:
             print(f"❌ Erro ao enviar dados: {e}")
 
+    def flush_data(self):
+        """Descarrega os pacotes bufferizados para o STM32."""
+        try:
+            self.link.flush()
+        except Exception as e:
+            print(f"❌ Erro ao descarregar dados: {e}")
+
     def process_input(self):
         """Lê e processa eventos do joystick."""
         pygame.event.pump() 
@@ -64,11 +62,9 @@ class JoystickControl:
         y = -self.joystick.get_axis(self.AXIS_LEFT_STICK_Y)  
         x = self.joystick.get_axis(self.AXIS_LEFT_STICK_X)   
 
-        if abs(y) < 0.1:
-            y = 0
-        if abs(x) < 0.1:
-            x = 0
-
+        # Zona morta radial de raio 0.1 (comparada ao quadrado, sem raiz)
+        if x * x + y * y < 0.01:
+            x = y = 0.0
 
         vl = (y + x) * self.MAX_SPEED  
         vr = (y - x) * self.MAX_SPEED  
@@ -81,19 +77,25 @@ class JoystickControl:
         self.last_x_button_state = x_button_state 
 
         self.send_data(vl, vr)  
+        self.flush_data()
 
     def run(self):
         """Loop principal do controle do joystick."""
         try:
             while True:
                 self.process_input()
+                self._clock.tick(self.TICK_HZ)
         except KeyboardInterrupt:
             print("\nFinalizando...")
         finally:
             pygame.quit()
-            self.ser.close()
+            try:
+                self.link.close()
+            except Exception as e:
+                print(f"❌ Erro ao descarregar dados: {e}")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
     joystick = JoystickControl()
     joystick.setup()
     joystick.run()
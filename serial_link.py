@@ -0,0 +1,99 @@
+from typing import Optional, Tuple
+import functools
+import io
+import logging
+import struct
+import serial
+import time
+import pyudev
+
+
+log: logging.Logger = logging.getLogger(__name__)
+
+# Serial packet: robot ID (int32) followed by left and right velocities (float32),
+# little-endian with no padding to match the STM32 firmware layout.
+_PKT: struct.Struct = struct.Struct('<iff')
+
+
+@functools.lru_cache(maxsize=1)
+def find_stm32_port() -> str:
+    """
+    Find the STM32 serial port.
+
+    The vendor ID is matched by udev itself, and the result is cached so
+    repeated connections skip the enumeration.
+
+    Returns:
+        str: The STM32 serial device path
+
+    Raises:
+        RuntimeError: If the STM32 device is not found
+    """
+    context = pyudev.Context()
+    # udev ORs multiple property matches, so only the vendor is filtered there
+    for device in context.list_devices(subsystem='tty').match_property('ID_VENDOR_ID', '0483'):
+        if device.get('ID_MODEL_ID') == '5740':
+            return device.device_node
+
+    raise RuntimeError("STM32 Virtual COM Port not found!")
+
+
+class SerialLink:
+    def __init__(self, port: Optional[str] = None, baudrate: int = 115200) -> None:
+        """
+        Open the serial link to the STM32.
+
+        Args:
+            port: The serial device path, or None to locate the STM32 automatically
+            baudrate: The serial baud rate
+        """
+        self.HEARTBEAT_INTERVAL: float = 0.2
+
+        # Preallocated transmit buffer reused for every packet
+        self._tx_buf: bytearray = bytearray(_PKT.size)
+        self._tx_mv: memoryview = memoryview(self._tx_buf)
+        # Last command sent, so unchanged commands are only resent as a heartbeat
+        self._last_cmd: Optional[Tuple[int, float, float]] = None
+        self._last_tx_ts: float = 0.0
+
+        self.ser: serial.Serial = serial.Serial(port or find_stm32_port(), baudrate, timeout=1)
+        # Buffer packets so each tick goes out as a single USB transfer
+        self._tx: io.BufferedWriter = io.BufferedWriter(self.ser, buffer_size=64)
+
+    @property
+    def port(self) -> str:
+        """str: The serial device path."""
+        return self.ser.port
+
+    def send(self, robot_id: int, vl: float, vr: float) -> None:
+        """
+        Queue a command when it changed or a heartbeat is due.
+
+        Args:
+            robot_id: The target robot ID
+            vl: The left wheel velocity
+            vr: The right wheel velocity
+        """
+        cmd: Tuple[int, float, float] = (robot_id, vl, vr)
+        now: float = time.monotonic()
+        if cmd == self._last_cmd and now - self._last_tx_ts < self.HEARTBEAT_INTERVAL:
+            return
+        _PKT.pack_into(self._tx_buf, 0, robot_id, vl, vr)
+        self._tx.write(self._tx_mv)
+        self._last_cmd = cmd
+        self._last_tx_ts = now
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("📤 Sent: ID=%d, VL=%.2f, VR=%.2f", robot_id, vl, vr)
+
+    def flush(self) -> None:
+        """Write buffered packets to the STM32."""
+        self._tx.flush()
+
+    def close(self) -> None:
+        """Flush pending packets and close the serial port."""
+        if not self.ser.is_open:
+            return
+        try:
+            self._tx.flush()
+        finally:
+            self.ser.close()